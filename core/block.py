@@ -0,0 +1,22 @@
+from typing import Dict, Iterable, List
+
+from .helpers import remove_prefix
+from .surface import Surface
+
+
+class Block:
+    surfaces: Iterable[Surface]
+    meshname: str
+    extra_meshes: List[str]
+
+    def __init__(self, attributes: Dict[str, str], surfaces: Iterable[Surface]) -> None:
+        self.meshname = remove_prefix(attributes["mesh_data_name"], "meshes/")
+
+        self.extra_meshes = []
+        for i in range(2):
+            try:
+                self.extra_meshes.append(remove_prefix(attributes[f"mesh_{i}_name"], "meshes/"))
+            except KeyError:
+                pass
+
+        self.surfaces = surfaces
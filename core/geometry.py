@@ -0,0 +1,148 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from .meshdata import SUBMESH_DTYPE, MeshData
+from .meshformat import VERTEX_DTYPE
+from .vertex import apply_transform
+
+
+def assign_triangles(triangle_count: int, submesh_table: np.ndarray) -> np.ndarray:
+    starts = submesh_table["start"].astype(np.int64)
+    ends = submesh_table["end"].astype(np.int64)
+
+    order = np.argsort(starts, kind="stable")
+    offsets = np.arange(triangle_count, dtype=np.int64) * 3
+
+    slots = np.searchsorted(starts[order], offsets, side="right") - 1
+    owners = order[np.maximum(slots, 0)]
+
+    owners[(slots < 0) | (offsets >= ends[owners])] = -1
+
+    return owners
+
+
+def partition_submeshes(faces: np.ndarray, submesh_table: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    owners = assign_triangles(len(faces), submesh_table)
+
+    order = np.argsort(owners, kind="stable")
+    counts = np.bincount(owners + 1, minlength=len(submesh_table) + 1)
+
+    partitions = []
+
+    # The first group holds triangles outside every submesh range
+    for triangles in np.split(order, np.cumsum(counts)[:-1])[1:]:
+        vertex_ids, local_faces = np.unique(faces[triangles].ravel(), return_inverse=True)
+
+        partitions.append((vertex_ids, local_faces.reshape(-1, 3)))
+
+    return partitions
+
+
+def weld_vertices(positions: np.ndarray, colours: np.ndarray,
+                  normals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    rows = np.empty(len(positions), dtype=VERTEX_DTYPE)
+    rows["colour"] = colours
+
+    # Adding zero folds negative zero into zero so that both compare equal as bytes
+    rows["position"] = positions + np.float32(0)
+    rows["normal"] = normals + np.float32(0)
+
+    _, first, inverse = np.unique(rows.view(f"V{VERTEX_DTYPE.itemsize}"), return_index=True, return_inverse=True)
+
+    # Number the unique vertices in order of first use rather than byte order
+    order = np.argsort(first, kind="stable")
+    ranks = np.empty_like(order)
+    ranks[order] = np.arange(len(order))
+
+    return first[order], ranks[inverse.ravel()]
+
+
+def submesh_bounds(positions: np.ndarray, faces: np.ndarray,
+                   submesh_table: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    culling_min = np.zeros((len(submesh_table), 3), dtype=np.float32)
+    culling_max = np.zeros((len(submesh_table), 3), dtype=np.float32)
+
+    indices = faces.ravel()
+
+    for i, (start, end) in enumerate(zip(submesh_table["start"].tolist(), submesh_table["end"].tolist())):
+        if end > start:
+            corner_positions = positions[indices[start:end]]
+
+            culling_min[i] = corner_positions.min(axis=0)
+            culling_max[i] = corner_positions.max(axis=0)
+
+    return culling_min, culling_max
+
+
+def _extract_chunk(mesh: MeshData, faces: np.ndarray, owners: np.ndarray, triangles: np.ndarray) -> MeshData:
+    triangles = triangles[np.argsort(owners[triangles], kind="stable")]
+    vertex_ids, local_faces = np.unique(faces[triangles].ravel(), return_inverse=True)
+
+    submeshes, counts = np.unique(owners[triangles], return_counts=True)
+    starts = np.cumsum(counts) - counts
+
+    table = np.zeros(len(submeshes), dtype=SUBMESH_DTYPE)
+    table["start"] = starts * 3
+    table["end"] = (starts + counts) * 3
+    table["shader"] = mesh.submesh_table["shader"][submeshes]
+
+    table["culling_min"], table["culling_max"] = submesh_bounds(mesh.positions[vertex_ids], local_faces, table)
+
+    return MeshData(mesh.positions[vertex_ids], mesh.colours[vertex_ids], mesh.normals[vertex_ids], local_faces,
+                    table)
+
+
+def split_mesh(mesh: MeshData, max_vertices: int = 2 ** 16 - 1) -> List[MeshData]:
+    if mesh.vertex_count <= max_vertices:
+        return [mesh]
+
+    faces = mesh.indices.astype(np.int64)
+    owners = assign_triangles(len(faces), mesh.submesh_table)
+    centroids = mesh.positions[faces].mean(axis=1)
+
+    chunks = []
+    pending = [np.flatnonzero(owners >= 0)]
+
+    # Halve oversized chunks at the median triangle centroid along their longest axis
+    while len(pending) > 0:
+        triangles = pending.pop()
+
+        if len(np.unique(faces[triangles])) <= max_vertices:
+            chunks.append(_extract_chunk(mesh, faces, owners, triangles))
+            continue
+
+        points = centroids[triangles]
+        axis = np.argmax(points.max(axis=0) - points.min(axis=0))
+
+        half = len(triangles) // 2
+        order = np.argpartition(points[:, axis], half)
+
+        pending.append(triangles[order[half:]])
+        pending.append(triangles[order[:half]])
+
+    return chunks
+
+
+# Stormworks is left handed and y up while Blender is right handed and z up
+HANDEDNESS = np.diag([-1.0, 1.0, 1.0, 1.0])
+SWIZZLE = np.array([[1.0, 0.0, 0.0, 0.0],
+                    [0.0, 0.0, 1.0, 0.0],
+                    [0.0, 1.0, 0.0, 0.0],
+                    [0.0, 0.0, 0.0, 1.0]])
+
+
+def tile_matrix_world(matrix: np.ndarray) -> np.ndarray:
+    world = SWIZZLE @ HANDEDNESS @ matrix.transpose() @ SWIZZLE
+    world[3] = 0, 0, 0, 1
+
+    return world
+
+
+def transform_tile_vertices(positions: np.ndarray, normals: np.ndarray,
+                            matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    affine = HANDEDNESS @ matrix.transpose()
+
+    positions, normals = apply_transform(positions, normals, affine[:3, :3], affine[:3, 3])
+
+    return positions.astype(np.float32), normals.astype(np.float32)
@@ -0,0 +1,16 @@
+import os
+
+
+def remove_prefix(text: str, prefix: str) -> str:
+    if text.startswith(prefix):
+        return text[len(prefix):]
+    return text
+
+
+def cache_directory() -> str:
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    path = os.path.join(base, "stormworks_mesh")
+
+    os.makedirs(path, exist_ok=True)
+
+    return path
@@ -0,0 +1,91 @@
+import mmap
+from typing import List, Tuple
+
+import numpy as np
+
+from .meshdata import MeshData, make_submesh_table
+from .meshformat import decode_indices, decode_vertices, read_layout
+from .submesh import Submesh
+
+
+class MappedMesh:
+    filepath: str
+
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+
+        self._file = open(filepath, "rb")
+
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+
+        try:
+            self._layout = read_layout(self._map)
+        except BaseException:
+            self.close()
+            raise
+
+        self._vertices = None
+        self._indices = None
+
+    def __enter__(self) -> "MappedMesh":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    @property
+    def vertex_count(self) -> int:
+        return self._layout.vertex_count
+
+    @property
+    def triangle_count(self) -> int:
+        return self._layout.triangle_count
+
+    @property
+    def submeshes(self) -> List[Submesh]:
+        return self._layout.submeshes
+
+    def _get_vertices(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if self._vertices is None:
+            self._vertices = decode_vertices(self._map, self._layout)
+
+        return self._vertices
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._get_vertices()[0]
+
+    @property
+    def colours(self) -> np.ndarray:
+        return self._get_vertices()[1]
+
+    @property
+    def normals(self) -> np.ndarray:
+        return self._get_vertices()[2]
+
+    @property
+    def indices(self) -> np.ndarray:
+        if self._indices is None:
+            self._indices = decode_indices(self._map, self._layout)
+
+        return self._indices
+
+    def read_mesh_data(self) -> MeshData:
+        return MeshData(self.positions, self.colours, self.normals, self.indices,
+                        make_submesh_table(self._layout.submeshes))
+
+    def read_vertices(self, start: int, end: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return decode_vertices(self._map, self._layout, start, end)
+
+    def read_submesh(self, submesh: Submesh) -> np.ndarray:
+        start, end = submesh.vertices
+
+        return decode_indices(self._map, self._layout, start, min(end, self._layout.triangle_count * 3))
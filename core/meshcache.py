@@ -0,0 +1,247 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .helpers import cache_directory
+from .mappedmesh import MappedMesh
+from .meshdata import MeshData
+from .meshformat import DECODER_VERSION
+
+CacheKey = Tuple[int, int]
+
+
+class DiskMeshCache:
+    directory: str
+    max_bytes: int
+    size: Optional[int]
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        # Measured by the first eviction scan and tracked in memory afterwards
+        self.size = None
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _filepath(self, path: str) -> str:
+        name = hashlib.blake2b(path.encode(), digest_size=16).hexdigest()
+
+        return os.path.join(self.directory, f"{name}.npz")
+
+    def load(self, path: str, key: CacheKey) -> Optional[MeshData]:
+        filepath = self._filepath(path)
+
+        try:
+            with np.load(filepath) as archive:
+                if int(archive["version"]) != DECODER_VERSION or (*archive["source"].tolist(),) != key:
+                    return None
+
+                mesh = MeshData(archive["positions"], archive["colours"], archive["normals"], archive["indices"],
+                                archive["submesh_table"])
+
+            os.utime(filepath)
+        except (OSError, KeyError, ValueError):
+            return None
+
+        return mesh
+
+    def store(self, path: str, key: CacheKey, mesh: MeshData) -> None:
+        filepath = self._filepath(path)
+        temporary_filepath = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        # The cache is an optimisation, so a failed write must never abort the import
+        try:
+            with open(temporary_filepath, "wb") as file:
+                np.savez(file,
+                         version=np.int64(DECODER_VERSION),
+                         source=np.array(key, dtype=np.int64),
+                         positions=mesh.positions,
+                         colours=mesh.colours,
+                         normals=mesh.normals,
+                         indices=mesh.indices,
+                         submesh_table=mesh.submesh_table)
+
+            size = os.path.getsize(temporary_filepath)
+            previous_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+
+            os.replace(temporary_filepath, filepath)
+        except OSError as exception:
+            print(f"Could not write mesh cache entry for {path}: {exception}")
+
+            try:
+                os.remove(temporary_filepath)
+            except OSError:
+                pass
+
+            return
+
+        with self._lock:
+            if self.size is None:
+                self._evict()
+                return
+
+            self.size += size - previous_size
+
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".npz")]
+            entries = sorted(((entry.stat().st_mtime_ns, entry.stat().st_size, entry.path) for entry in entries))
+        except OSError:
+            return
+
+        size = sum(entry[1] for entry in entries)
+
+        # Evicting below the cap leaves room for later stores before the directory has to be scanned again
+        target = self.max_bytes * 3 // 4 if size > self.max_bytes else size
+
+        for _, entry_size, filepath in entries:
+            if size <= target:
+                break
+
+            try:
+                os.remove(filepath)
+            except OSError:
+                continue
+
+            size -= entry_size
+
+        self.size = size
+
+
+class MeshCache:
+    max_bytes: int
+    size: int
+    hits: int
+    misses: int
+    disk_hits: int
+    evictions: int
+    disk: Optional[DiskMeshCache]
+
+    def __init__(self, max_bytes: int, disk: DiskMeshCache = None) -> None:
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[str, Tuple[CacheKey, MeshData, int]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(filepath: str) -> Tuple[str, CacheKey]:
+        stat = os.stat(filepath)
+
+        return os.path.abspath(filepath), (stat.st_mtime_ns, stat.st_size)
+
+    def lookup(self, filepath: str) -> Optional[MeshData]:
+        path, key = self._key(filepath)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+
+        if self.disk is None:
+            return None
+
+        mesh = self.disk.load(path, key)
+
+        if mesh is not None:
+            with self._lock:
+                self.disk_hits += 1
+
+            self.put(path, key, mesh)
+
+        return mesh
+
+    def load(self, filepath: str) -> MeshData:
+        path, key = self._key(filepath)
+
+        with MappedMesh(filepath) as mapped:
+            mesh = mapped.read_mesh_data()
+
+        self.add(path, key, mesh)
+
+        return mesh
+
+    def get(self, filepath: str) -> MeshData:
+        mesh = self.lookup(filepath)
+
+        if mesh is None:
+            mesh = self.load(filepath)
+
+        return mesh
+
+    def add(self, path: str, key: CacheKey, mesh: MeshData) -> None:
+        if self.disk is not None:
+            self.disk.store(path, key, mesh)
+
+        self.put(path, key, mesh)
+
+    def put(self, path: str, key: CacheKey, mesh: MeshData) -> None:
+        mesh.set_read_only()
+
+        size = mesh.nbytes
+
+        with self._lock:
+            self._remove(path)
+
+            self._entries[path] = key, mesh, size
+            self.size += size
+
+            self._evict()
+
+    def _remove(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+
+        if entry is not None:
+            self.size -= entry[2]
+
+    def _evict(self) -> None:
+        while self.size > self.max_bytes and len(self._entries) > 0:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+    def configure(self, max_bytes: int, disk_max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+        if disk_max_bytes <= 0:
+            self.disk = None
+        elif self.disk is None:
+            try:
+                self.disk = DiskMeshCache(os.path.join(cache_directory(), "meshes"), disk_max_bytes)
+            except OSError as exception:
+                print(f"Disk mesh cache unavailable: {exception}")
+        else:
+            self.disk.max_bytes = disk_max_bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> str:
+        return f"Mesh cache: {self.hits} hits, {self.misses} misses ({self.disk_hits} from disk), " \
+               f"{self.evictions} evictions, {len(self._entries)} meshes in {self.size / 2 ** 20:.1f} MiB"
+
+
+mesh_cache = MeshCache(256 * 2 ** 20)
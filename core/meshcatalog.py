@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from .helpers import cache_directory
+from .meshformat import read_layout
+from .submesh import Submesh
+
+CATALOG_VERSION = 1
+
+_catalogs: Dict[str, "MeshCatalog"] = {}
+
+
+class MeshFolderError(ValueError):
+    """Raised when the configured mesh folder cannot be used"""
+
+
+def _check_meshfolder(meshfolder: str) -> None:
+    # An empty preference would otherwise resolve to the working directory and index everything below it
+    if meshfolder == "" or not os.path.isdir(meshfolder):
+        raise MeshFolderError(f"Mesh folder \"{meshfolder}\" does not exist, set the Mesh Root Folder in the addon "
+                              f"preferences")
+
+
+class CatalogEntry:
+    path: str
+    size: int
+    mtime_ns: int
+    valid: bool
+    vertex_count: int
+    triangle_count: int
+    submeshes: List[Submesh]
+    content_hash: str
+
+    def __init__(self, path: str, size: int, mtime_ns: int, valid: bool, vertex_count: int, triangle_count: int,
+                 submeshes: List[Submesh], content_hash: str) -> None:
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.valid = valid
+        self.vertex_count = vertex_count
+        self.triangle_count = triangle_count
+        self.submeshes = submeshes
+        self.content_hash = content_hash
+
+
+class MeshCatalog:
+    meshfolder: str
+    database_path: str
+
+    def __init__(self, meshfolder: str, database_path: str = None) -> None:
+        _check_meshfolder(meshfolder)
+
+        self.meshfolder = os.path.abspath(meshfolder)
+
+        if database_path is None:
+            folder_hash = hashlib.blake2b(self.meshfolder.encode(), digest_size=8).hexdigest()
+            database_path = os.path.join(cache_directory(), f"catalog_{folder_hash}.sqlite")
+
+        self.database_path = database_path
+
+        self._connection = sqlite3.connect(database_path)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+
+        version = self._connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if version is None or version[0] != CATALOG_VERSION:
+            self._connection.execute("DROP TABLE IF EXISTS meshes")
+            self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (CATALOG_VERSION,))
+
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS meshes (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, valid INTEGER,"
+            " vertex_count INTEGER, triangle_count INTEGER, submeshes TEXT, content_hash TEXT)")
+        self._connection.commit()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    @staticmethod
+    def _normalise(path: str) -> str:
+        return path.replace("\\", "/")
+
+    @staticmethod
+    def _index_file(filepath: str) -> Tuple[bool, int, int, List[Submesh], str]:
+        with open(filepath, "rb") as file:
+            bytestring = file.read()
+
+        content_hash = hashlib.blake2b(bytestring, digest_size=16).hexdigest()
+
+        try:
+            layout = read_layout(bytestring)
+        except (AssertionError, struct.error):
+            return False, 0, 0, [], content_hash
+
+        return True, layout.vertex_count, layout.triangle_count, layout.submeshes, content_hash
+
+    def _update(self, path: str, filepath: str, stat: os.stat_result) -> None:
+        valid, vertex_count, triangle_count, submeshes, content_hash = self._index_file(filepath)
+
+        submesh_table = json.dumps([(*submesh.vertices, submesh.shader, submesh.culling_min, submesh.culling_max)
+                                    for submesh in submeshes])
+
+        self._connection.execute("INSERT OR REPLACE INTO meshes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                 (path, stat.st_size, stat.st_mtime_ns, valid, vertex_count, triangle_count,
+                                  submesh_table, content_hash))
+
+    def refresh(self) -> Tuple[int, int]:
+        known = {path: (size, mtime_ns) for path, size, mtime_ns in
+                 self._connection.execute("SELECT path, size, mtime_ns FROM meshes")}
+
+        updated = 0
+
+        for root, _, files in os.walk(self.meshfolder):
+            for filename in files:
+                if not filename.endswith(".mesh"):
+                    continue
+
+                filepath = os.path.join(root, filename)
+                path = self._normalise(os.path.relpath(filepath, self.meshfolder))
+
+                stat = os.stat(filepath)
+                if known.pop(path, None) == (stat.st_size, stat.st_mtime_ns):
+                    continue
+
+                self._update(path, filepath, stat)
+                updated += 1
+
+        self._connection.executemany("DELETE FROM meshes WHERE path = ?", [(path,) for path in known])
+        self._connection.commit()
+
+        return updated, len(known)
+
+    def get(self, path: str) -> Optional[CatalogEntry]:
+        path = self._normalise(path)
+        row = self._connection.execute("SELECT * FROM meshes WHERE path = ?", (path,)).fetchone()
+
+        # A single stat keeps the entry current with files added or changed since the last refresh
+        try:
+            stat = os.stat(os.path.join(self.meshfolder, path))
+        except OSError:
+            stat = None
+
+        if stat is None:
+            if row is not None:
+                self._connection.execute("DELETE FROM meshes WHERE path = ?", (path,))
+                self._connection.commit()
+
+            return None
+
+        if row is None or row[1:3] != (stat.st_size, stat.st_mtime_ns):
+            self._update(path, os.path.join(self.meshfolder, path), stat)
+            self._connection.commit()
+
+            row = self._connection.execute("SELECT * FROM meshes WHERE path = ?", (path,)).fetchone()
+
+        path, size, mtime_ns, valid, vertex_count, triangle_count, submesh_table, content_hash = row
+
+        submeshes = [Submesh((start, end), shader, (*culling_min,), (*culling_max,))
+                     for start, end, shader, culling_min, culling_max in json.loads(submesh_table)]
+
+        return CatalogEntry(path, size, mtime_ns, bool(valid), vertex_count, triangle_count, submeshes, content_hash)
+
+
+def get_catalog(meshfolder: str) -> MeshCatalog:
+    _check_meshfolder(meshfolder)
+
+    meshfolder = os.path.abspath(meshfolder)
+
+    catalog = _catalogs.get(meshfolder)
+
+    # Entries are revalidated as they are looked up, so the folder is never walked implicitly
+    if catalog is None:
+        catalog = MeshCatalog(meshfolder)
+        _catalogs[meshfolder] = catalog
+
+    return catalog
@@ -0,0 +1,79 @@
+from typing import List
+
+import numpy as np
+
+from .submesh import Submesh
+
+SUBMESH_DTYPE = np.dtype([
+    ("start", "<u4"),
+    ("end", "<u4"),
+    ("shader", "<u2"),
+    ("culling_min", "<f4", (3,)),
+    ("culling_max", "<f4", (3,)),
+])
+
+
+def make_submesh_table(submeshes: List[Submesh]) -> np.ndarray:
+    table = np.zeros(len(submeshes), dtype=SUBMESH_DTYPE)
+
+    for i, submesh in enumerate(submeshes):
+        table["start"][i], table["end"][i] = submesh.vertices
+        table["shader"][i] = submesh.shader
+
+        if submesh.culling_min is not None:
+            table["culling_min"][i] = submesh.culling_min
+            table["culling_max"][i] = submesh.culling_max
+
+    return table
+
+
+class MeshData:
+    positions: np.ndarray
+    colours: np.ndarray
+    normals: np.ndarray
+    indices: np.ndarray
+    submesh_table: np.ndarray
+
+    def __init__(self, positions: np.ndarray, colours: np.ndarray, normals: np.ndarray, indices: np.ndarray,
+                 submesh_table: np.ndarray = None) -> None:
+        self.positions = np.ascontiguousarray(positions, dtype=np.float32).reshape(-1, 3)
+        self.colours = np.ascontiguousarray(colours, dtype=np.uint8).reshape(-1, 4)
+        self.normals = np.ascontiguousarray(normals, dtype=np.float32).reshape(-1, 3)
+
+        index_dtype = np.uint16 if len(self.positions) <= 2 ** 16 else np.uint32
+        self.indices = np.ascontiguousarray(indices, dtype=index_dtype).reshape(-1, 3)
+
+        if submesh_table is None:
+            submesh_table = np.zeros(1, dtype=SUBMESH_DTYPE)
+            submesh_table["end"] = self.indices.size
+
+            if len(self.positions) != 0:
+                submesh_table["culling_min"] = self.positions.min(axis=0)
+                submesh_table["culling_max"] = self.positions.max(axis=0)
+
+        self.submesh_table = submesh_table
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.positions)
+
+    @property
+    def triangle_count(self) -> int:
+        return len(self.indices)
+
+    @property
+    def nbytes(self) -> int:
+        return self.positions.nbytes + self.colours.nbytes + self.normals.nbytes + self.indices.nbytes + \
+               self.submesh_table.nbytes
+
+    @property
+    def submeshes(self) -> List[Submesh]:
+        return [Submesh((start, end), shader, (*culling_min,), (*culling_max,))
+                for start, end, shader, culling_min, culling_max in self.submesh_table.tolist()]
+
+    def set_read_only(self) -> None:
+        for array in self.positions, self.colours, self.normals, self.indices, self.submesh_table:
+            array.flags.writeable = False
+
+    def with_vertices(self, positions: np.ndarray, normals: np.ndarray) -> "MeshData":
+        return MeshData(positions, self.colours, normals, self.indices, self.submesh_table)
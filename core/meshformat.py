@@ -0,0 +1,211 @@
+import struct
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .meshdata import MeshData, make_submesh_table
+from .submesh import Submesh
+
+MESH_HEADER = b"mesh\x07\x00\x01\x00"
+MESH_FOOTER = b"\x00\x00"
+
+# Bump whenever decode_mesh output changes so persisted caches are rebuilt
+DECODER_VERSION = 2
+
+VERTEX_DTYPE = np.dtype([
+    ("position", "<f4", (3,)),
+    ("colour", "u1", (4,)),
+    ("normal", "<f4", (3,)),
+])
+
+INDEX_DTYPE = np.dtype("<u2")
+
+# Two unknown bytes and the length prefixed name "ID0" followed by three floats, as written by the game's tools
+SUBMESH_TRAILER = b"\x00\x00\x03\x00ID0" + struct.pack("<fff", 1, 1, 1)
+SUBMESH_STRUCT = struct.Struct("<II2xH3f3f")
+
+
+def _read_submeshes(buffer, offset: int) -> Tuple[List[Submesh], int]:
+    (submesh_count,) = struct.unpack_from("<H", buffer, offset)
+    offset += 2
+
+    submeshes = []
+
+    for i in range(submesh_count):
+        start, count = struct.unpack_from("<II", buffer, offset)
+        offset += 10
+
+        (shader,) = struct.unpack_from("<H", buffer, offset)
+        offset += 2
+
+        culling_min = struct.unpack_from("<fff", buffer, offset)
+        culling_max = struct.unpack_from("<fff", buffer, offset + 12)
+        offset += 24
+
+        # Two unknown bytes, then a length prefixed name and three trailing floats
+        offset += 2
+        (name_length,) = struct.unpack_from("<H", buffer, offset)
+        offset += 2 + name_length + 12
+
+        submeshes.append(Submesh((start, start + count), shader, culling_min, culling_max))
+
+    return submeshes, offset
+
+
+class MeshLayout:
+    vertex_count: int
+    vertex_offset: int
+    index_count: int
+    index_offset: int
+    submeshes: List[Submesh]
+
+    def __init__(self, vertex_count: int, vertex_offset: int, index_count: int, index_offset: int,
+                 submeshes: List[Submesh]) -> None:
+        self.vertex_count = vertex_count
+        self.vertex_offset = vertex_offset
+        self.index_count = index_count
+        self.index_offset = index_offset
+        self.submeshes = submeshes
+
+    @property
+    def triangle_count(self) -> int:
+        return self.index_count // 3
+
+    @property
+    def shaders(self) -> List[int]:
+        return [submesh.shader for submesh in self.submeshes]
+
+    @property
+    def bounds(self) -> Optional[Tuple[Tuple[float, float, float], Tuple[float, float, float]]]:
+        if len(self.submeshes) == 0:
+            return None
+
+        culling_min = (*map(min, zip(*(submesh.culling_min for submesh in self.submeshes))),)
+        culling_max = (*map(max, zip(*(submesh.culling_max for submesh in self.submeshes))),)
+
+        return culling_min, culling_max
+
+
+def read_layout(buffer) -> MeshLayout:
+    assert buffer[:len(MESH_HEADER)] == MESH_HEADER and buffer[-len(MESH_FOOTER):] == MESH_FOOTER
+
+    offset = len(MESH_HEADER)
+    (vertex_count,) = struct.unpack_from("<H", buffer, offset)
+    offset += 2 + 4
+
+    vertex_offset = offset
+    offset += vertex_count * VERTEX_DTYPE.itemsize
+
+    (index_count,) = struct.unpack_from("<I", buffer, offset)
+    offset += 4
+
+    index_offset = offset
+    offset += index_count * INDEX_DTYPE.itemsize
+
+    submeshes, offset = _read_submeshes(buffer, offset)
+
+    return MeshLayout(vertex_count, vertex_offset, index_count, index_offset, submeshes)
+
+
+def read_mesh_info(filepath: str) -> MeshLayout:
+    with open(filepath, "rb") as file:
+        header = file.read(len(MESH_HEADER) + 6)
+        assert header.startswith(MESH_HEADER)
+
+        (vertex_count,) = struct.unpack_from("<H", header, len(MESH_HEADER))
+
+        vertex_offset = len(header)
+        file.seek(vertex_offset + vertex_count * VERTEX_DTYPE.itemsize)
+
+        (index_count,) = struct.unpack("<I", file.read(4))
+
+        index_offset = file.tell()
+        file.seek(index_offset + index_count * INDEX_DTYPE.itemsize)
+
+        table = file.read()
+
+    assert table.endswith(MESH_FOOTER)
+
+    submeshes, _ = _read_submeshes(table, 0)
+
+    return MeshLayout(vertex_count, vertex_offset, index_count, index_offset, submeshes)
+
+
+def decode_vertices(buffer, layout: MeshLayout, start: int = 0,
+                    end: int = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if end is None:
+        end = layout.vertex_count
+
+    offset = layout.vertex_offset + start * VERTEX_DTYPE.itemsize
+    vertex_block = np.frombuffer(buffer, VERTEX_DTYPE, end - start, offset)
+
+    positions = vertex_block["position"].copy()
+    colours = vertex_block["colour"].copy()
+    normals = vertex_block["normal"].copy()
+
+    return positions, colours, normals
+
+
+def decode_indices(buffer, layout: MeshLayout, start: int = 0, end: int = None) -> np.ndarray:
+    if end is None:
+        end = layout.triangle_count * 3
+
+    offset = layout.index_offset + start * INDEX_DTYPE.itemsize
+    index_block = np.frombuffer(buffer, INDEX_DTYPE, end - start, offset)
+
+    return index_block.reshape(-1, 3).copy()
+
+
+def decode_mesh(data: bytes) -> MeshData:
+    buffer = memoryview(data)
+    layout = read_layout(buffer)
+
+    positions, colours, normals = decode_vertices(buffer, layout)
+    indices = decode_indices(buffer, layout)
+
+    return MeshData(positions, colours, normals, indices, make_submesh_table(layout.submeshes))
+
+
+def encode_mesh(mesh: MeshData) -> bytes:
+    assert mesh.vertex_count < 2 ** 16
+
+    vertices = np.empty(mesh.vertex_count, dtype=VERTEX_DTYPE)
+    vertices["position"] = mesh.positions
+    vertices["colour"] = mesh.colours
+    vertices["normal"] = mesh.normals
+
+    indices = mesh.indices.astype(INDEX_DTYPE).ravel()
+    table = mesh.submesh_table
+
+    buffer = bytearray(len(MESH_HEADER) + 6 + vertices.nbytes + 4 + indices.nbytes + 2 +
+                       len(table) * (SUBMESH_STRUCT.size + len(SUBMESH_TRAILER)) + len(MESH_FOOTER))
+    view = memoryview(buffer)
+
+    view[:len(MESH_HEADER)] = MESH_HEADER
+    offset = len(MESH_HEADER)
+
+    struct.pack_into("<HI", buffer, offset, mesh.vertex_count, 0x13)
+    offset += 6
+
+    view[offset:offset + vertices.nbytes] = vertices.tobytes()
+    offset += vertices.nbytes
+
+    struct.pack_into("<I", buffer, offset, indices.size)
+    offset += 4
+
+    view[offset:offset + indices.nbytes] = indices.tobytes()
+    offset += indices.nbytes
+
+    struct.pack_into("<H", buffer, offset, len(table))
+    offset += 2
+
+    for start, end, shader, culling_min, culling_max in table.tolist():
+        SUBMESH_STRUCT.pack_into(buffer, offset, start, end - start, shader, *culling_min, *culling_max)
+        offset += SUBMESH_STRUCT.size
+
+        view[offset:offset + len(SUBMESH_TRAILER)] = SUBMESH_TRAILER
+        offset += len(SUBMESH_TRAILER)
+
+    view[offset:] = MESH_FOOTER
+
+    return bytes(buffer)
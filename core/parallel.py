@@ -0,0 +1,75 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, Tuple
+
+from .mappedmesh import MappedMesh
+from .meshcache import CacheKey, MeshCache
+from .meshdata import MeshData
+
+
+def _decode_file(filepath: str) -> Tuple[CacheKey, MeshData]:
+    stat = os.stat(filepath)
+
+    with MappedMesh(filepath) as mapped:
+        mesh = mapped.read_mesh_data()
+
+    return (stat.st_mtime_ns, stat.st_size), mesh
+
+
+def decode_parallel(filepaths: Iterable[str], cache: MeshCache, max_workers: int = None,
+                    executable: str = None) -> Iterator[Tuple[str, MeshData]]:
+    pending = []
+
+    # Meshes held in memory or on disk are handed over straight away while the workers start
+    for filepath in dict.fromkeys(filepaths):
+        mesh = cache.lookup(filepath)
+
+        if mesh is None:
+            pending.append(filepath)
+        else:
+            yield filepath, mesh
+
+    # Starting worker processes costs more than decoding a single mesh
+    if len(pending) < 2:
+        for filepath in pending:
+            yield filepath, cache.load(filepath)
+
+        return
+
+    decoded = set()
+
+    # Results go to the caller as they complete rather than through the cache, where the memory budget could
+    # evict them before they are used
+    context = multiprocessing.get_context("spawn")
+
+    # Hosts whose sys.executable is not a Python interpreter have to name one for the workers
+    if executable is not None:
+        context.set_executable(executable)
+
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            futures = {executor.submit(_decode_file, filepath): filepath for filepath in pending}
+
+            for future in as_completed(futures):
+                filepath = futures[future]
+
+                try:
+                    key, mesh = future.result()
+                except BrokenProcessPool:
+                    raise
+                except Exception as exception:
+                    print(f"Failed to decode {filepath} in worker: {exception}")
+                    continue
+
+                cache.add(os.path.abspath(filepath), key, mesh)
+                decoded.add(filepath)
+
+                yield filepath, mesh
+    except (BrokenProcessPool, OSError) as exception:
+        print(f"Parallel decoding unavailable, falling back to serial decoding: {exception}")
+
+    for filepath in pending:
+        if filepath not in decoded:
+            yield filepath, cache.load(filepath)
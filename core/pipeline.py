@@ -0,0 +1,111 @@
+import queue
+import threading
+import time
+from typing import Callable, Generic, Iterator, List, Sequence, Tuple, TypeVar
+
+Job = TypeVar("Job")
+Result = TypeVar("Result")
+
+_DONE = object()
+
+
+class MeshPipeline(Generic[Job, Result]):
+    """Loads jobs on background threads into a bounded queue drained by the calling thread"""
+
+    jobs: Sequence[Job]
+    depth: int
+    workers: int
+
+    load_time: float
+    producer_wait: float
+    consumer_wait: float
+
+    def __init__(self, jobs: Sequence[Job], loader: Callable[[Job], Result], depth: int = 8, workers: int = 2) -> None:
+        self.jobs = jobs
+        self.depth = depth
+        self.workers = workers
+
+        self.load_time = 0
+        self.producer_wait = 0
+        self.consumer_wait = 0
+
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _put(self, results: queue.Queue, item: object) -> float:
+        start = time.perf_counter()
+
+        while not self._stopped.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+
+        return time.perf_counter() - start
+
+    def _produce(self, pending: queue.Queue, results: queue.Queue) -> None:
+        load_time = 0
+        producer_wait = 0
+
+        while not self._stopped.is_set():
+            try:
+                job = pending.get_nowait()
+            except queue.Empty:
+                break
+
+            start = time.perf_counter()
+            try:
+                item = job, self._loader(job), None
+            except Exception as exception:
+                item = job, None, exception
+            load_time += time.perf_counter() - start
+
+            producer_wait += self._put(results, item)
+
+        producer_wait += self._put(results, _DONE)
+
+        with self._lock:
+            self.load_time += load_time
+            self.producer_wait += producer_wait
+
+    def __iter__(self) -> Iterator[Tuple[Job, Result]]:
+        pending = queue.Queue()
+        for job in self.jobs:
+            pending.put(job)
+
+        results = queue.Queue(maxsize=self.depth)
+
+        threads: List[threading.Thread] = []
+        for i in range(max(1, min(self.workers, len(self.jobs)))):
+            thread = threading.Thread(target=self._produce, args=(pending, results), daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        running = len(threads)
+
+        try:
+            while running > 0:
+                start = time.perf_counter()
+                item = results.get()
+                self.consumer_wait += time.perf_counter() - start
+
+                if item is _DONE:
+                    running -= 1
+                    continue
+
+                job, result, exception = item
+                if exception is not None:
+                    raise exception
+
+                yield job, result
+        finally:
+            self._stopped.set()
+
+            for thread in threads:
+                thread.join()
+
+    def stats(self) -> str:
+        return f"Pipeline: {self.load_time:.2f}s loading, producers waited {self.producer_wait:.2f}s on a full " \
+               f"queue, consumer waited {self.consumer_wait:.2f}s on an empty queue"
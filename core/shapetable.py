@@ -0,0 +1,144 @@
+import math
+import os
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .helpers import cache_directory
+from .vertex import apply_transform, compose_rotations
+
+ROTATIONS = 4
+SHAPEDEFS_VERSION = 1
+
+
+class CompiledShapes:
+    positions: np.ndarray
+    normals: np.ndarray
+    shape_offsets: np.ndarray
+    axes: np.ndarray
+    angles: np.ndarray
+    transformation_offsets: np.ndarray
+
+    def __init__(self, positions: np.ndarray, normals: np.ndarray, shape_offsets: np.ndarray, axes: np.ndarray,
+                 angles: np.ndarray, transformation_offsets: np.ndarray) -> None:
+        self.positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        self.normals = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+        self.shape_offsets = np.asarray(shape_offsets, dtype=np.int64)
+        self.axes = np.asarray(axes, dtype=np.float32).reshape(-1, 3)
+        self.angles = np.asarray(angles, dtype=np.float64)
+        self.transformation_offsets = np.asarray(transformation_offsets, dtype=np.int64)
+
+    @staticmethod
+    def compile(shapes: list, transformations: list) -> "CompiledShapes":
+        corners = [corner for shape in shapes for face in shape for corner in face]
+        steps = [step for transformation in transformations for step in transformation]
+
+        return CompiledShapes(
+            [position for position, _ in corners],
+            [normal for _, normal in corners],
+            np.concatenate(([0], np.cumsum([len(shape) * 3 for shape in shapes]))),
+            [axis for axis, _ in steps],
+            [angle for _, angle in steps],
+            np.concatenate(([0], np.cumsum([len(transformation) for transformation in transformations]))),
+        )
+
+    def transformation(self, index: int) -> list:
+        start, end = self.transformation_offsets[index:index + 2]
+
+        return [(axis, angle) for axis, angle in zip(self.axes[start:end].tolist(), self.angles[start:end].tolist())]
+
+    @property
+    def transformation_count(self) -> int:
+        return len(self.transformation_offsets) - 1
+
+
+def _shapedefs_key() -> Tuple[int, int, int]:
+    stat = os.stat(os.path.join(os.path.dirname(__file__), "shapedefs.py"))
+
+    return SHAPEDEFS_VERSION, stat.st_mtime_ns, stat.st_size
+
+
+def load_compiled_shapes() -> CompiledShapes:
+    key = _shapedefs_key()
+    filepath = os.path.join(cache_directory(), "shapedefs.npz")
+
+    try:
+        with np.load(filepath) as archive:
+            if (*archive["source"].tolist(),) == key:
+                return CompiledShapes(archive["positions"], archive["normals"], archive["shape_offsets"],
+                                      archive["axes"], archive["angles"], archive["transformation_offsets"])
+    except (OSError, KeyError, ValueError):
+        pass
+
+    from .shapedefs import SHAPES, TRANSFORMATIONS
+
+    compiled = CompiledShapes.compile(SHAPES, TRANSFORMATIONS)
+
+    temporary_filepath = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        with open(temporary_filepath, "wb") as file:
+            np.savez(file,
+                     source=np.array(key, dtype=np.int64),
+                     positions=compiled.positions,
+                     normals=compiled.normals,
+                     shape_offsets=compiled.shape_offsets,
+                     axes=compiled.axes,
+                     angles=compiled.angles,
+                     transformation_offsets=compiled.transformation_offsets)
+
+        os.replace(temporary_filepath, filepath)
+    except OSError:
+        pass
+
+    return compiled
+
+
+class ShapeTable:
+    positions: np.ndarray
+    normals: np.ndarray
+    offsets: np.ndarray
+
+    def __init__(self, compiled: CompiledShapes) -> None:
+        self.offsets = compiled.shape_offsets
+
+        matrices = []
+        for index in range(compiled.transformation_count):
+            steps = compiled.transformation(index)
+
+            for rotation in range(ROTATIONS):
+                matrices.append(compose_rotations([((1, 0, 0), rotation / 2 * math.pi), *steps]))
+
+        # One block of transformed corners per (orientation, rotation) pair
+        blocks = [apply_transform(compiled.positions, compiled.normals, matrix, np.zeros(3)) for matrix in matrices]
+
+        self.positions = np.array([positions for positions, _ in blocks], dtype=np.float32)
+        self.normals = np.array([normals for _, normals in blocks], dtype=np.float32)
+
+    def build(self, shapes: np.ndarray, orientations: np.ndarray, rotations: np.ndarray,
+              offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        counts = self.offsets[shapes + 1] - self.offsets[shapes]
+        total = int(counts.sum())
+
+        surfaces = np.repeat(np.arange(len(shapes)), counts)
+        corners = np.arange(total) - np.repeat(np.cumsum(counts) - counts - self.offsets[shapes], counts)
+        blocks = (orientations * ROTATIONS + rotations % ROTATIONS)[surfaces]
+
+        positions = self.positions[blocks, corners] + offsets[surfaces] * 0.25
+        normals = self.normals[blocks, corners]
+        faces = np.arange(total, dtype=np.uint32).reshape(-1, 3)
+
+        return positions.astype(np.float32), normals, faces
+
+
+_table: Optional[ShapeTable] = None
+
+
+def get_shape_table() -> ShapeTable:
+    global _table
+
+    if _table is None:
+        _table = ShapeTable(load_compiled_shapes())
+
+    return _table
@@ -0,0 +1,15 @@
+from typing import Optional, Tuple
+
+
+class Submesh:
+    vertices: Tuple[int, int]
+    shader: int
+    culling_min: Optional[Tuple[float, float, float]]
+    culling_max: Optional[Tuple[float, float, float]]
+
+    def __init__(self, vertices: Tuple[int, int], shader: int, culling_min: Tuple[float, float, float] = None,
+                 culling_max: Tuple[float, float, float] = None) -> None:
+        self.vertices = vertices
+        self.shader = shader
+        self.culling_min = culling_min
+        self.culling_max = culling_max
@@ -0,0 +1,10 @@
+from typing import Iterable
+
+from .mesh import Mesh
+
+
+class Tile:
+    meshes: Iterable[Mesh]
+
+    def __init__(self, meshes: Iterable[Mesh]) -> None:
+        self.meshes = meshes
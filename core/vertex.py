@@ -0,0 +1,39 @@
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+
+def create_rotation_matrix(axis: np.array, theta: float) -> np.array:
+    axis = np.asarray(axis)
+    axis = axis / math.sqrt(np.dot(axis, axis))
+    a = math.cos(theta / 2.0)
+    b, c, d = -axis * math.sin(theta / 2.0)
+    aa, bb, cc, dd = a * a, b * b, c * c, d * d
+    bc, ad, ac, ab, bd, cd = b * c, a * d, a * c, a * b, b * d, c * d
+    return np.array([[aa + bb - cc - dd, 2 * (bc + ad), 2 * (bd - ac)],
+                     [2 * (bc - ad), aa + cc - bb - dd, 2 * (cd + ab)],
+                     [2 * (bd + ac), 2 * (cd - ab), aa + dd - bb - cc]])
+
+
+def compose_rotations(transformations: List[Tuple[Tuple[float, float, float], float]]) -> np.ndarray:
+    matrix = np.identity(3)
+
+    for axis, angle in transformations:
+        matrix = create_rotation_matrix(axis, angle) @ matrix
+
+    return matrix
+
+
+def apply_transform(positions: np.ndarray, normals: np.ndarray, linear: np.ndarray,
+                    translation: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    transformed_positions = positions @ linear.transpose() + translation
+
+    # Normals transform by the inverse transpose, which as row vectors is a product with the inverse
+    transformed_normals = normals @ np.linalg.inv(linear)
+
+    lengths = np.linalg.norm(transformed_normals, axis=-1, keepdims=True)
+    transformed_normals /= np.where(lengths == 0, 1, lengths)
+
+    return transformed_positions, transformed_normals
+
@@ -0,0 +1,69 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Tuple
+
+from .block import Block
+from .mesh import Mesh
+from .surface import Surface
+from .tile import Tile
+
+NUMERIC_ATTRIBUTE = re.compile(r"(\d\d=)")
+
+CHUNK_SIZE = 2 ** 16
+
+
+def _iter_events(filepath: str) -> Iterator[Tuple[str, ET.Element]]:
+    parser = ET.XMLPullParser(("start", "end"))
+    pending = ""
+
+    with open(filepath, "r") as file:
+        while True:
+            chunk = file.read(CHUNK_SIZE)
+            text = pending + chunk
+
+            if chunk == "":
+                parser.feed(NUMERIC_ATTRIBUTE.sub(r"t\1", text))
+                parser.close()
+                yield from parser.read_events()
+                return
+
+            # Attribute names cannot contain whitespace, so a rename never spans a split made after whitespace
+            split = max(map(text.rfind, " \t\r\n")) + 1
+
+            parser.feed(NUMERIC_ATTRIBUTE.sub(r"t\1", text[:split]))
+            pending = text[split:]
+
+            yield from parser.read_events()
+
+
+def _iter_children(events: Iterator[Tuple[str, ET.Element]], container: str,
+                   stack: List[ET.Element] = None) -> Iterator[ET.Element]:
+    if stack is None:
+        stack = []
+
+    for event, element in events:
+        if event == "start":
+            stack.append(element)
+            continue
+
+        stack.pop()
+
+        if len(stack) == 2 and stack[-1].tag == container:
+            yield element
+
+            # Drop finished records so the tree never holds more than the one being read
+            stack[-1].remove(element)
+
+
+def read_tile(filepath: str) -> Tile:
+    events = _iter_events(filepath)
+
+    return Tile(map(Mesh, _iter_children(events, "meshes")))
+
+
+def read_block(filepath: str) -> Block:
+    events = _iter_events(filepath)
+
+    _, root = next(events)
+
+    return Block(root.attrib, map(Surface, _iter_children(events, "surfaces", [root])))
@@ -1,12 +1,15 @@
-import struct
-from typing import Set
+import json
+import os
+from typing import TYPE_CHECKING, List, Set
 
 import bmesh
-import bpy
-from bpy.props import StringProperty
-from bpy.types import Operator
+from bpy.props import EnumProperty, StringProperty
+from bpy.types import Mesh, Object, Operator
 from bpy_extras.io_utils import ExportHelper
 
+if TYPE_CHECKING:
+    from .core.meshdata import MeshData
+
 
 class ExportStormworksMesh(Operator, ExportHelper):
     """Export Stormworks Mesh"""
@@ -22,135 +25,204 @@ class ExportStormworksMesh(Operator, ExportHelper):
         maxlen=255,
     )
 
+    source: EnumProperty(
+        name="Source",
+        items=[
+            ("EVALUATED", "Evaluated", "Export a temporary copy of the object with modifiers applied and leave the "
+                                       "scene untouched"),
+            ("ORIGINAL", "Original", "Triangulate the object's own mesh data in place and export it"),
+        ],
+        default="EVALUATED",
+    )
+
     @staticmethod
-    def _put(bytestring: bytes, structure: str, *values: object) -> bytes:
-        packed_bytes = struct.pack(structure, *values)
+    def _read_chunk_manifest(manifest_filepath: str) -> List[str]:
+        try:
+            with open(manifest_filepath) as file:
+                entries = json.load(file)
+        except (OSError, ValueError):
+            return []
+
+        directory = os.path.dirname(manifest_filepath)
+        owned = []
+
+        for name, size, mtime_ns in entries:
+            path = os.path.join(directory, name)
+
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
 
-        return bytestring + packed_bytes
+            if (stat.st_size, stat.st_mtime_ns) == (size, mtime_ns):
+                owned.append(path)
+
+        return owned
 
     @staticmethod
-    def _write(bytestring: bytes, bytes_to_write: bytes) -> bytes:
-        return bytestring + bytes_to_write
+    def _write_chunk_manifest(manifest_filepath: str, filepaths: List[str]) -> None:
+        entries = []
+        for path in filepaths:
+            stat = os.stat(path)
+            entries.append((os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+
+        with open(manifest_filepath, "w") as file:
+            json.dump(entries, file)
 
     @staticmethod
-    def write_mesh(filepath: str) -> None:
-        obj = bpy.context.object
+    def get_slot_shader(obj: Object, slot: int) -> int:
+        # Slots linked to the object rather than the mesh only resolve through the object
+        material = obj.material_slots[slot].material if slot < len(obj.material_slots) else None
 
-        assert obj and obj.type == "MESH"
+        if material is None:
+            return slot
 
-        mesh = obj.data
+        return int(material.get("stormworks_shader", slot))
 
-        bm = bmesh.new()
-        bm.from_mesh(mesh)
+    @staticmethod
+    def read_mesh_data(mesh: Mesh, obj: Object) -> "MeshData":
+        import numpy as np
 
-        bmesh.ops.triangulate(bm, faces=bm.faces, quad_method="BEAUTY", ngon_method="BEAUTY")
+        from .core.geometry import weld_vertices
+        from .core.meshdata import SUBMESH_DTYPE, MeshData
 
-        bm.to_mesh(mesh)
-        bm.free()
+        mesh.calc_loop_triangles()
+        mesh.calc_normals_split()
 
-        bytestring = b"mesh\x07\x00\x01\x00"
+        loop_count = len(mesh.loops)
 
-        colour_layer = None
-        if len(mesh.vertex_colors) != 0:
-            colour_layer = mesh.vertex_colors[0].data
+        vertex_positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", vertex_positions)
 
-        mesh.calc_loop_triangles()
+        loop_vertices = np.empty(loop_count, dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loop_vertices)
 
-        vertices = [None] * len(mesh.vertices)
-        for triangle in mesh.loop_triangles:
-            for loop_index in triangle.loops:
-                loop = mesh.loops[loop_index]
-                vertex_index = loop.vertex_index
+        loop_normals = np.empty(loop_count * 3, dtype=np.float32)
+        mesh.loops.foreach_get("normal", loop_normals)
 
-                vertex = mesh.vertices[vertex_index]
+        corners = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", corners)
 
-                position = vertex.co
+        triangle_slots = np.empty(len(mesh.loop_triangles), dtype=np.int32)
+        mesh.loop_triangles.foreach_get("material_index", triangle_slots)
 
-                colour = 255, 255, 255, 255
-                if colour_layer is not None:
-                    colour = *map(lambda a: int(a * 255), colour_layer[loop_index].color),
+        # Triangles of one material slot form one contiguous index range and therefore one submesh
+        order = np.argsort(triangle_slots, kind="stable")
+        corners = corners.reshape(-1, 3)[order].ravel()
 
-                vertices[vertex_index] = [position, None, colour]
+        slots, counts = np.unique(triangle_slots, return_counts=True)
+        ends = np.cumsum(counts) * 3
 
-        mesh.calc_normals_split()
+        submesh_table = np.zeros(len(slots), dtype=SUBMESH_DTYPE)
+        submesh_table["start"] = ends - counts * 3
+        submesh_table["end"] = ends
+        submesh_table["shader"] = [ExportStormworksMesh.get_slot_shader(obj, slot) for slot in slots.tolist()]
 
-        for triangle in mesh.loop_triangles:
-            for loop_index in triangle.loops:
-                loop = mesh.loops[loop_index]
-                vertex_index = loop.vertex_index
+        swizzle = (0, 2, 1)
 
-                position, _, colour = *vertices[vertex_index],
-                position[1], position[2] = position[2], position[1]
+        positions = vertex_positions.reshape(-1, 3)[loop_vertices[corners]][:, swizzle]
+        normals = loop_normals.reshape(-1, 3)[corners][:, swizzle]
+        colours = np.full((len(corners), 4), 255, dtype=np.uint8)
 
-                normal = loop.normal
-                normal[1], normal[2] = normal[2], normal[1]
+        if len(mesh.vertex_colors) != 0:
+            loop_colours = np.empty(loop_count * 4, dtype=np.float32)
+            mesh.vertex_colors[0].data.foreach_get("color", loop_colours)
 
-                vertices[vertex_index] = [position, normal, colour]
+            colours = (np.clip(loop_colours, 0, 1) * 255).astype(np.uint8).reshape(-1, 4)[corners]
 
-        assert len(vertices) <= 2 ** 16
+        # Corners only share a vertex when position, normal and colour all match, which keeps hard edges and seams
+        vertex_ids, indices = weld_vertices(positions, colours, normals)
 
-        bytestring = ExportStormworksMesh._put(bytestring, "H", len(vertices))
-        bytestring = ExportStormworksMesh._write(bytestring, b"\x13\x00\x00\x00")
+        return MeshData(positions[vertex_ids], colours[vertex_ids], normals[vertex_ids], indices, submesh_table)
 
-        min_pos = [0, 0, 0]
-        max_pos = [0, 0, 0]
+    @staticmethod
+    def write_mesh(context, filepath: str, source: str = "EVALUATED") -> List[str]:
+        import numpy as np
 
-        for vertex in vertices:
-            position, normal, colour = vertex
+        from .core.geometry import split_mesh, submesh_bounds
+        from .core.meshformat import encode_mesh
 
-            for i in range(3):
-                min_pos[i] = min(min_pos[i], position[i])
-                max_pos[i] = max(max_pos[i], position[i])
+        obj = context.object
 
-            bytestring = ExportStormworksMesh._put(bytestring, "fff", *position)
+        assert obj and obj.type == "MESH"
 
-            bytestring = ExportStormworksMesh._put(bytestring, "BBBB", *colour)
-            bytestring = ExportStormworksMesh._put(bytestring, "fff", *normal)
+        if source == "EVALUATED":
+            evaluated = obj.evaluated_get(context.evaluated_depsgraph_get())
 
-        assert len(mesh.loop_triangles) * 3 <= 2 ** 32
+            # Loop triangles tessellate the temporary mesh, so nothing is written back to the object
+            try:
+                mesh_data = ExportStormworksMesh.read_mesh_data(evaluated.to_mesh(), evaluated)
+            finally:
+                evaluated.to_mesh_clear()
+        else:
+            mesh = obj.data
 
-        bytestring = ExportStormworksMesh._put(bytestring, "I", len(mesh.loop_triangles) * 3)
+            bm = bmesh.new()
+            bm.from_mesh(mesh)
 
-        for triangle in mesh.loop_triangles:
-            for loop_index in triangle.loops:
-                vertex_index = mesh.loops[loop_index].vertex_index
+            bmesh.ops.triangulate(bm, faces=bm.faces, quad_method="BEAUTY", ngon_method="BEAUTY")
 
-                bytestring = ExportStormworksMesh._put(bytestring, "H", vertex_index)
+            bm.to_mesh(mesh)
+            bm.free()
 
-        for i in range(3):
-            if min_pos[i] == 0:
-                min_pos[i] -= 0.125
+            mesh_data = ExportStormworksMesh.read_mesh_data(mesh, obj)
 
-            if max_pos[i] == 0:
-                max_pos[i] += 0.125
+        chunks = split_mesh(mesh_data)
 
-        bytestring = ExportStormworksMesh._put(bytestring, "H", 1)
+        stem, extension = os.path.splitext(filepath)
+        filepaths = [filepath] if len(chunks) == 1 else [f"{stem}_{i}{extension}" for i in range(len(chunks))]
 
-        bytestring = ExportStormworksMesh._put(bytestring, "II", 0, len(mesh.loop_triangles) * 3)
+        manifest_filepath = f"{filepath}.chunks.json"
+        owned = ExportStormworksMesh._read_chunk_manifest(manifest_filepath)
 
-        bytestring = ExportStormworksMesh._write(bytestring, b"\x00\x00")
+        # Chunk names may collide with unrelated assets, which are never overwritten
+        if len(chunks) > 1:
+            conflicts = [os.path.basename(path) for path in filepaths if os.path.exists(path) and path not in owned]
 
-        bytestring = ExportStormworksMesh._put(bytestring, "H", 0)
+            if len(conflicts) > 0:
+                raise FileExistsError(f"Mesh exceeds {2 ** 16 - 1} vertices and has to be split, but these files "
+                                      f"exist and were not written by an earlier export: {', '.join(conflicts)}")
 
-        bytestring = ExportStormworksMesh._put(bytestring, "fff", *min_pos)
-        bytestring = ExportStormworksMesh._put(bytestring, "fff", *max_pos)
+        for chunk, chunk_filepath in zip(chunks, filepaths):
+            culling_min, culling_max = submesh_bounds(chunk.positions, chunk.indices, chunk.submesh_table)
 
-        # No idea what these bytes do so yeah
-        bytestring = ExportStormworksMesh._write(bytestring,
-                                                 b"\x00\x00\x03\x00\x49\x44\x30\x00\x00\x80\x3F\x00\x00\x80\x3F\x00\x00"
-                                                 b"\x80\x3F")
+            # Flat submeshes still get a volume along their flat axes
+            flat = culling_min == culling_max
+            chunk.submesh_table["culling_min"] = np.where(flat, culling_min - 0.125, culling_min)
+            chunk.submesh_table["culling_max"] = np.where(flat, culling_max + 0.125, culling_max)
 
-        bytestring = ExportStormworksMesh._write(bytestring, b"\x00\x00")
+            with open(chunk_filepath, "wb") as output:
+                output.write(encode_mesh(chunk))
 
-        with open(filepath, "wb") as output:
-            output.write(bytestring)
+        # Only chunks recorded by an earlier export and unchanged since are ever removed
+        for path in owned:
+            if path not in filepaths:
+                os.remove(path)
+
+        if len(chunks) > 1:
+            ExportStormworksMesh._write_chunk_manifest(manifest_filepath, filepaths)
+        elif os.path.exists(manifest_filepath):
+            os.remove(manifest_filepath)
+
+        return filepaths
 
     @staticmethod
-    def export_mesh(context, filepath: str) -> None:
+    def export_mesh(context, filepath: str, source: str) -> List[str]:
         print(f"Exporting to {filepath}")
-        ExportStormworksMesh.write_mesh(filepath)
+        filepaths = ExportStormworksMesh.write_mesh(context, filepath, source)
         print(f"Finished Exporting")
 
+        return filepaths
+
     def execute(self, context) -> Set[str]:
-        ExportStormworksMesh.export_mesh(context, self.filepath)
+        try:
+            filepaths = ExportStormworksMesh.export_mesh(context, self.filepath, self.source)
+        except FileExistsError as exception:
+            self.report({"ERROR"}, str(exception))
+            return {"CANCELLED"}
+
+        if len(filepaths) > 1:
+            self.report({"WARNING"}, f"Mesh exceeds {2 ** 16 - 1} vertices and was split into {len(filepaths)} "
+                                     f"files: {', '.join(os.path.basename(path) for path in filepaths)}")
+
         return {"FINISHED"}
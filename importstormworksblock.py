@@ -1,22 +1,20 @@
-import math
 import os
-import re
-import xml.etree.ElementTree as ET
-from typing import Set, Tuple
+from typing import TYPE_CHECKING, Set, Tuple
 
-import numpy as np
-from bpy.props import StringProperty
+from bpy.props import BoolProperty, StringProperty
 from bpy_extras.io_utils import ImportHelper
 from bpy_types import Operator
 
-from .block import Block
 from .importstormworksmesh import ImportStormworksMesh
-from .shapedefs import SHAPES, TRANSFORMATIONS
-from .vertex import Vertex
+
+if TYPE_CHECKING:
+    from .core.meshcatalog import MeshCatalog
 
 
 def findNormal(p1: Tuple[float, float, float], p2: Tuple[float, float, float],
                p3: Tuple[float, float, float]) -> Tuple[float, float, float]:
+    import numpy as np
+
     p1 = np.array(p1)
     p2 = np.array(p2)
     p3 = np.array(p3)
@@ -45,69 +43,82 @@ class ImportStormworksBlock(Operator, ImportHelper):
         maxlen=255,
     )
 
+    single_object: BoolProperty(
+        name="Single Object",
+        description="Create one object per mesh file with a material slot per shader instead of one object per "
+                    "submesh",
+        default=False,
+    )
+
     @staticmethod
-    def read_block(filepath: str, meshfolder: str) -> None:
-        with open(filepath, "r") as file:
-            xmlstring = file.read()
+    def _validate_mesh(catalog: "MeshCatalog", meshname: str) -> bool:
+        entry = catalog.get(meshname)
 
-        xmlstring = re.sub(r"(\d\d=)", r"t\1", xmlstring)
-        parsedContent = ET.fromstring(xmlstring)
+        if entry is None or not entry.valid:
+            print(f"Skipping missing or invalid mesh {meshname}")
+            return False
 
-        block = Block(parsedContent)
+        return True
 
-        if block.meshname != "":
-            meshpath = os.path.join(meshfolder, block.meshname)
-            vertices, faces, submeshes = ImportStormworksMesh.read_mesh(meshpath)
+    @staticmethod
+    def read_block(filepath: str, meshfolder: str, single_object: bool = False) -> None:
+        import numpy as np
+
+        from .core import xmlstream
+        from .core.meshcatalog import get_catalog
+        from .core.meshdata import MeshData
+        from .core.shapetable import get_shape_table
 
-            ImportStormworksMesh.add_mesh(block.meshname, vertices, faces, submeshes)
+        block = xmlstream.read_block(filepath)
 
+        meshnames = [] if block.meshname == "" else [block.meshname]
         for mesh in block.extra_meshes:
             if mesh == "":
                 break
 
-            meshpath = os.path.join(meshfolder, mesh)
-            vertices, faces, submeshes = ImportStormworksMesh.read_mesh(meshpath)
-
-            ImportStormworksMesh.add_mesh(block.meshname, vertices, faces, submeshes)
+            meshnames.append(mesh)
 
-        vertices = []
-        faces = []
+        # Blocks made only of surfaces import without a configured mesh folder
+        catalog = get_catalog(meshfolder) if len(meshnames) != 0 else None
 
-        index_count = 0
-
-        for surface in block.surfaces:
-            extrafaces = SHAPES[surface.shape]
-
-            if len(extrafaces) == 0:
+        for meshname in meshnames:
+            if not ImportStormworksBlock._validate_mesh(catalog, meshname):
                 continue
 
-            transformations = TRANSFORMATIONS[surface.orientation]
+            meshpath = os.path.join(meshfolder, meshname)
+            mesh_data = ImportStormworksMesh.read_mesh(meshpath)
 
-            for face in extrafaces:
-                transformation = [((1, 0, 0), surface.rotation / 2 * math.pi)]
+            ImportStormworksMesh.add_mesh(block.meshname, mesh_data, single_object)
 
-                for i in range(3):
-                    position, normal = face[i]
-                    vertex = Vertex(*position, 255, 255, 255, 255, *normal)
+        surfaces = np.array([(surface.shape, surface.orientation, surface.rotation, *surface.position)
+                             for surface in block.surfaces], dtype=np.int64).reshape(-1, 6)
 
-                    if surface.rotation != 0:
-                        vertex.transform(transformation, (0, 0, 0))
+        positions, normals, faces = get_shape_table().build(surfaces[:, 0], surfaces[:, 1], surfaces[:, 2],
+                                                            surfaces[:, 3:6])
+        colours = np.full((len(positions), 4), 255, dtype=np.uint8)
 
-                    vertex.transform(transformations, surface.position)
+        ImportStormworksMesh.add_mesh(f"{block.meshname}_surfaces", MeshData(positions, colours, normals, faces))
 
-                    vertices.append(vertex)
+    @staticmethod
+    def import_tile(context, filepath: str, single_object: bool) -> None:
+        from .core.meshcache import mesh_cache
 
-                faces.append((index_count, index_count + 1, index_count + 2))
-                index_count += 3
+        ImportStormworksMesh.configure_cache(context)
 
-        ImportStormworksMesh.add_mesh(f"{block.meshname}_surfaces", vertices, faces)
+        preferences = context.preferences.addons[__package__].preferences
 
-    @staticmethod
-    def import_tile(context, filepath: str) -> None:
         print(f"Importing {filepath}")
-        ImportStormworksBlock.read_block(filepath, context.preferences.addons[__package__].preferences.meshfolderpath)
+        ImportStormworksBlock.read_block(filepath, preferences.meshfolderpath, single_object)
         print(f"Finished Importing")
+        print(mesh_cache.stats())
 
     def execute(self, context) -> Set[str]:
-        ImportStormworksBlock.import_tile(context, self.filepath)
+        from .core.meshcatalog import MeshFolderError
+
+        try:
+            ImportStormworksBlock.import_tile(context, self.filepath, self.single_object)
+        except MeshFolderError as exception:
+            self.report({"ERROR"}, str(exception))
+            return {"CANCELLED"}
+
         return {"FINISHED"}
@@ -1,13 +1,16 @@
-import struct
-from typing import List, Tuple, Set, Any
+import os
+from typing import TYPE_CHECKING, List, Optional, Tuple, Set
 
 import bpy
-from bpy.props import StringProperty
+from bpy.props import BoolProperty, CollectionProperty, StringProperty
 from bpy_extras.io_utils import ImportHelper
+from bpy.types import Mesh
 from bpy_types import Operator
 
-from .submesh import Submesh
-from .vertex import Vertex
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .core.meshdata import MeshData
 
 
 class ImportStormworksMesh(Operator, ImportHelper):
@@ -24,136 +27,157 @@ class ImportStormworksMesh(Operator, ImportHelper):
         maxlen=255,
     )
 
-    @staticmethod
-    def _get(bytestring: bytes, structure: str) -> Tuple[bytes, Tuple[Any]]:
-        size = struct.calcsize(structure)
+    files: CollectionProperty(
+        type=bpy.types.OperatorFileListElement,
+        options={"HIDDEN", "SKIP_SAVE"},
+    )
 
-        a, bytestring = bytestring[:size], bytestring[size:]
+    directory: StringProperty(
+        subtype="DIR_PATH",
+        options={"HIDDEN", "SKIP_SAVE"},
+    )
 
-        return bytestring, struct.unpack(structure, a)
+    single_object: BoolProperty(
+        name="Single Object",
+        description="Create one object per mesh file with a material slot per shader instead of one object per "
+                    "submesh",
+        default=False,
+    )
 
     @staticmethod
-    def _skip(bytestring: bytes, size: int) -> bytes:
-        return bytestring[size:]
+    def configure_cache(context) -> None:
+        from .core.meshcache import mesh_cache
 
-    @staticmethod
-    def read_mesh(filepath: str) -> Tuple[List[Vertex], List[Tuple[int, int, int]], List[Submesh]]:
-        with open(filepath, "rb") as file:
-            bytestring = file.read()
+        preferences = context.preferences.addons[__package__].preferences
+        mesh_cache.configure(preferences.meshcachesize * 2 ** 20, preferences.diskcachesize * 2 ** 20)
 
-        assert bytestring.startswith(b"mesh\x07\x00\x01\x00") and bytestring.endswith(b"\x00\x00")
+    @staticmethod
+    def read_mesh(filepath: str) -> "MeshData":
+        from .core.meshcache import mesh_cache
 
-        bytestring = ImportStormworksMesh._skip(bytestring, 8)
-        bytestring, (vertex_count,) = ImportStormworksMesh._get(bytestring, "H")
-        bytestring = ImportStormworksMesh._skip(bytestring, 4)
+        return mesh_cache.get(filepath)
 
-        vertices = []
+    @staticmethod
+    def create_mesh(name: str, positions: "np.ndarray", colours: "np.ndarray", normals: "np.ndarray",
+                    faces: "np.ndarray") -> Mesh:
+        import numpy as np
 
-        for i in range(vertex_count):
-            bytestring, position = ImportStormworksMesh._get(bytestring, "fff")
+        root_mesh = bpy.data.meshes.new(name)
 
-            bytestring, colour = ImportStormworksMesh._get(bytestring, "BBBB")
+        loop_count = len(faces) * 3
+        loop_vertices = faces.astype(np.int32).ravel()
 
-            bytestring, normal = ImportStormworksMesh._get(bytestring, "fff")
+        root_mesh.vertices.add(len(positions))
+        root_mesh.vertices.foreach_set("co", positions[:, (0, 2, 1)].astype(np.float32).ravel())
 
-            vertex = Vertex(*position, *colour, *normal)
-            vertices.append(vertex)
+        root_mesh.loops.add(loop_count)
+        root_mesh.loops.foreach_set("vertex_index", loop_vertices)
 
-        bytestring, (triangle_count,) = ImportStormworksMesh._get(bytestring, "I")
-        triangle_count = triangle_count // 3
+        root_mesh.polygons.add(len(faces))
+        root_mesh.polygons.foreach_set("loop_start", np.arange(0, loop_count, 3, dtype=np.int32))
+        root_mesh.polygons.foreach_set("loop_total", np.full(len(faces), 3, dtype=np.int32))
 
-        faces = []
+        root_mesh.update(calc_edges=True)
 
-        for i in range(triangle_count):
-            bytestring, points = ImportStormworksMesh._get(bytestring, "HHH")
+        root_mesh.normals_split_custom_set_from_vertices(normals[:, (0, 2, 1)].astype(np.float32))
+        root_mesh.use_auto_smooth = True
 
-            faces.append(points)
+        colour_layer = root_mesh.vertex_colors.new(name="Col")
+        colour_layer.data.foreach_set("color", (colours[loop_vertices] / 255).astype(np.float32).ravel())
 
-        bytestring, (submesh_count,) = ImportStormworksMesh._get(bytestring, "H")
+        root_mesh.update()
 
-        submeshes = []
+        return root_mesh
 
-        for i in range(submesh_count):
-            bytestring, (vertexStartIndex, vertexCount) = ImportStormworksMesh._get(bytestring, "II")
-            endIndex = vertexStartIndex + vertexCount
+    @staticmethod
+    def get_shader_material(shader: int) -> bpy.types.Material:
+        name = f"Stormworks Shader {shader}"
 
-            bytestring = ImportStormworksMesh._skip(bytestring, 2)
+        material = bpy.data.materials.get(name)
+        if material is None:
+            material = bpy.data.materials.new(name)
+            material["stormworks_shader"] = shader
 
-            bytestring, (shader,) = ImportStormworksMesh._get(bytestring, "H")
+        return material
 
-            bytestring, culling_min = ImportStormworksMesh._get(bytestring, "fff")
+    @staticmethod
+    def build_meshes(name, mesh: "MeshData", single_object: bool = False) -> List[Tuple[Optional[int], Mesh]]:
+        import numpy as np
 
-            bytestring, culling_max = ImportStormworksMesh._get(bytestring, "fff")
+        from .core.geometry import assign_triangles, partition_submeshes
 
-            ImportStormworksMesh._skip(bytestring, 19)
+        faces = mesh.indices.astype(np.int64)
+        shaders = mesh.submesh_table["shader"].tolist()
 
-            submesh = Submesh((vertexStartIndex, endIndex), shader)
-            submeshes.append(submesh)
+        if single_object:
+            owners = assign_triangles(len(faces), mesh.submesh_table)
+            owned = owners >= 0
 
-        ImportStormworksMesh._skip(bytestring, 2)
+            vertex_ids, faces_local = np.unique(faces[owned].ravel(), return_inverse=True)
 
-        return vertices, faces, submeshes
+            root_mesh = ImportStormworksMesh.create_mesh(name, mesh.positions[vertex_ids], mesh.colours[vertex_ids],
+                                                         mesh.normals[vertex_ids], faces_local.reshape(-1, 3))
 
-    @staticmethod
-    def add_mesh(name, vertices: List[Vertex], faces: List[Tuple[int, int, int]],
-                 submeshes: List[Submesh] = None) -> None:
+            slot_shaders, submesh_slots = np.unique(shaders, return_inverse=True)
+            for shader in slot_shaders.tolist():
+                root_mesh.materials.append(ImportStormworksMesh.get_shader_material(shader))
 
-        if submeshes is None:
-            submeshes = [Submesh((0, len(vertices)), 0)]
+            root_mesh.polygons.foreach_set("material_index", submesh_slots.astype(np.int32)[owners[owned]])
 
-        for submesh in submeshes:
-            start, end = submesh.vertices
-            vertices_local = vertices[start:end]
+            return [(None, root_mesh)]
 
-            faces_local = []
+        root_meshes = []
 
-            for face in faces:
-                for i in range(3):
-                    if start <= face[i] < end:
-                        faces_local.append(face)
-                        break
+        for shader, (vertex_ids, faces_local) in zip(shaders, partition_submeshes(faces, mesh.submesh_table)):
+            name_formatted = f"{name}_{shader}"
 
-            name_formatted = f"{name}_{submesh.shader}"
+            root_mesh = ImportStormworksMesh.create_mesh(name_formatted, mesh.positions[vertex_ids],
+                                                         mesh.colours[vertex_ids], mesh.normals[vertex_ids],
+                                                         faces_local)
 
-            root_mesh = bpy.data.meshes.new(name_formatted)
+            root_meshes.append((shader, root_mesh))
 
-            vertices_as_tuple_list = list(map(lambda a: (a.x, a.z, a.y), vertices_local))
+        return root_meshes
 
-            root_mesh.from_pydata(vertices_as_tuple_list, [], faces_local)
+    @staticmethod
+    def add_mesh(name, mesh: "MeshData", single_object: bool = False) -> None:
+        scene = bpy.context.scene
 
-            normals = [None] * len(root_mesh.vertices)
-            for loop in root_mesh.loops:
-                vertex = vertices_local[loop.vertex_index]
-                normals[loop.vertex_index] = (vertex.nx, vertex.nz, vertex.ny)
+        for _, root_mesh in ImportStormworksMesh.build_meshes(name, mesh, single_object):
+            obj = bpy.data.objects.new(root_mesh.name, root_mesh)
+            scene.collection.objects.link(obj)
 
-            root_mesh.normals_split_custom_set_from_vertices(normals)
-            root_mesh.use_auto_smooth = True
+    @staticmethod
+    def import_mesh(context, filepath: str, single_object: bool = False) -> None:
+        ImportStormworksMesh.configure_cache(context)
 
-            root_mesh.update()
+        print(f"Importing {filepath}")
+        mesh = ImportStormworksMesh.read_mesh(filepath)
+        print(f"Finished Importing")
 
-            colour_layer = root_mesh.vertex_colors.new(name="Col")
+        ImportStormworksMesh.add_mesh("Imported Mesh", mesh, single_object)
 
-            for poly in root_mesh.polygons:
-                for loop_index in poly.loop_indices:
-                    vertex_index = root_mesh.loops[loop_index].vertex_index
+    @staticmethod
+    def import_meshes(context, filepaths: List[str], single_object: bool = False) -> None:
+        from .core.pipeline import MeshPipeline
 
-                    colour_layer.data[loop_index].color = vertices_local[vertex_index].r / 255, vertices_local[
-                        vertex_index].g / 255, vertices_local[vertex_index].b / 255, vertices_local[
-                                                              vertex_index].a / 255
+        ImportStormworksMesh.configure_cache(context)
 
-            obj = bpy.data.objects.new(root_mesh.name, root_mesh)
+        pipeline = MeshPipeline(filepaths, ImportStormworksMesh.read_mesh)
 
-            scene = bpy.context.scene
-            scene.collection.objects.link(obj)
+        for filepath, mesh in pipeline:
+            print(f"Importing {filepath}")
+            ImportStormworksMesh.add_mesh("Imported Mesh", mesh, single_object)
 
-    @staticmethod
-    def import_mesh(context, filepath: str) -> None:
-        print(f"Importing {filepath}")
-        vertices, faces, submeshes = ImportStormworksMesh.read_mesh(filepath)
         print(f"Finished Importing")
-
-        ImportStormworksMesh.add_mesh("Imported Mesh", vertices, faces, submeshes)
+        print(pipeline.stats())
 
     def execute(self, context) -> Set[str]:
-        ImportStormworksMesh.import_mesh(context, self.filepath)
+        filepaths = [os.path.join(self.directory, file.name) for file in self.files if file.name != ""]
+
+        if len(filepaths) > 1:
+            ImportStormworksMesh.import_meshes(context, filepaths, self.single_object)
+        else:
+            ImportStormworksMesh.import_mesh(context, self.filepath, self.single_object)
+
         return {"FINISHED"}
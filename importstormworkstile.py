@@ -1,15 +1,18 @@
 import os
-import re
-import xml.etree.ElementTree as ET
-from typing import Set
+from functools import partial
+from typing import TYPE_CHECKING, List, Optional, Set
 
-import numpy as np
-from bpy.props import StringProperty
+import bpy
+from bpy.props import BoolProperty, EnumProperty, StringProperty
 from bpy_extras.io_utils import ImportHelper
 from bpy_types import Operator
+from mathutils import Matrix
 
 from .importstormworksmesh import ImportStormworksMesh
-from .tile import Tile
+
+if TYPE_CHECKING:
+    from .core.mesh import Mesh
+    from .core.meshdata import MeshData
 
 
 class ImportStormworksTile(Operator, ImportHelper):
@@ -26,38 +29,168 @@ class ImportStormworksTile(Operator, ImportHelper):
         maxlen=255,
     )
 
+    decoding: EnumProperty(
+        name="Decoding",
+        items=[
+            ("SERIAL", "Serial", "Decode meshes one after another on the main thread"),
+            ("PARALLEL", "Parallel", "Decode all referenced meshes up front in worker processes"),
+            ("PIPELINE", "Pipeline", "Decode meshes on background threads while the main thread creates objects"),
+        ],
+        default="SERIAL",
+    )
+
+    single_object: BoolProperty(
+        name="Single Object",
+        description="Create one object per placed mesh with a material slot per shader instead of one object per "
+                    "submesh",
+        default=False,
+    )
+
+    instancing: BoolProperty(
+        name="Instance Meshes",
+        description="Share one mesh datablock per mesh file between all placements and position each placement "
+                    "through its object transform",
+        default=False,
+    )
+
+    @staticmethod
+    def _python_executable() -> Optional[str]:
+        # Blender only points sys.executable at its bundled Python from 2.91 on
+        if bpy.app.version < (2, 91, 0):
+            return bpy.app.binary_path_python
+
+        return None
+
     @staticmethod
-    def read_tile(filepath: str, meshfolder: str) -> None:
-        with open(filepath, "r") as file:
-            xmlstring = file.read()
+    def _place_mesh(mesh_data: "MeshData", mesh: "Mesh") -> "MeshData":
+        from .core.geometry import transform_tile_vertices
+
+        positions, normals = transform_tile_vertices(mesh_data.positions, mesh_data.normals,
+                                                     mesh.transformation.matrix)
+
+        return mesh_data.with_vertices(positions, normals)
+
+    @staticmethod
+    def _load_mesh(meshfolder: str, mesh: "Mesh") -> "MeshData":
+        mesh_data = ImportStormworksMesh.read_mesh(os.path.join(meshfolder, mesh.filename))
+
+        return ImportStormworksTile._place_mesh(mesh_data, mesh)
+
+    @staticmethod
+    def _add_instances(meshfolder: str, meshes: List["Mesh"], decoding: str, single_object: bool) -> None:
+        from .core.geometry import tile_matrix_world
+        from .core.meshcache import mesh_cache
+        from .core.parallel import decode_parallel
+        from .core.pipeline import MeshPipeline
+
+        filenames = [*dict.fromkeys(mesh.filename for mesh in meshes)]
+
+        def load(filename: str) -> "MeshData":
+            return ImportStormworksMesh.read_mesh(os.path.join(meshfolder, filename))
 
-        xmlstring = re.sub(r"(\d\d=)", r"t\1", xmlstring)
-        parsedContent = ET.fromstring(xmlstring)
+        if decoding == "PIPELINE":
+            loaded = MeshPipeline(filenames, load)
+        elif decoding == "PARALLEL":
+            filepaths = {os.path.join(meshfolder, filename): filename for filename in filenames}
+            decoded = decode_parallel(filepaths, mesh_cache, executable=ImportStormworksTile._python_executable())
+            loaded = ((filepaths[filepath], mesh_data) for filepath, mesh_data in decoded)
+        else:
+            loaded = ((filename, load(filename)) for filename in filenames)
 
-        tile = Tile(parsedContent)
+        datablocks = {}
+        for filename, mesh_data in loaded:
+            datablocks[filename] = ImportStormworksMesh.build_meshes(filename, mesh_data, single_object)
 
+        if isinstance(loaded, MeshPipeline):
+            print(loaded.stats())
+
+        scene = bpy.context.scene
+
+        for mesh in meshes:
+            matrix_world = Matrix(tile_matrix_world(mesh.transformation.matrix).tolist())
+
+            for shader, root_mesh in datablocks[mesh.filename]:
+                name = mesh.mesh_id if shader is None else f"{mesh.mesh_id}_{shader}"
+
+                obj = bpy.data.objects.new(name, root_mesh)
+                obj.matrix_world = matrix_world
+                scene.collection.objects.link(obj)
+
+    @staticmethod
+    def read_tile(filepath: str, meshfolder: str, decoding: str = "SERIAL", single_object: bool = False,
+                  instancing: bool = False) -> None:
+        from .core import xmlstream
+        from .core.meshcache import mesh_cache
+        from .core.meshcatalog import get_catalog
+        from .core.parallel import decode_parallel
+        from .core.pipeline import MeshPipeline
+
+        tile = xmlstream.read_tile(filepath)
+        catalog = get_catalog(meshfolder)
+
+        meshes = []
         for mesh in tile.meshes:
-            filepath = os.path.join(meshfolder, mesh.filename)
-            vertices, faces, submeshes = ImportStormworksMesh.read_mesh(filepath)
+            entry = catalog.get(mesh.filename)
+            if entry is None or not entry.valid:
+                print(f"Skipping missing or invalid mesh {mesh.filename}")
+                continue
+
+            meshes.append(mesh)
+
+        if instancing:
+            ImportStormworksTile._add_instances(meshfolder, meshes, decoding, single_object)
+            return
+
+        if decoding == "PARALLEL":
+            placements = {}
+            for mesh in meshes:
+                placements.setdefault(os.path.join(meshfolder, mesh.filename), []).append(mesh)
 
-            for vertex in vertices:
-                matrix = mesh.transformation.matrix
+            # Each mesh is placed as soon as a worker delivers it, so placements are grouped by mesh file
+            decoded = decode_parallel(placements, mesh_cache, executable=ImportStormworksTile._python_executable())
 
-                pos = matrix.transpose().dot(np.array([vertex.x, vertex.y, vertex.z, 1]))
-                pos2 = matrix.transpose().dot(np.array([vertex.nx, vertex.ny, vertex.nz, 1]))
+            for filepath, mesh_data in decoded:
+                for mesh in placements[filepath]:
+                    ImportStormworksMesh.add_mesh(mesh.mesh_id, ImportStormworksTile._place_mesh(mesh_data, mesh),
+                                                  single_object)
 
-                vertex.x, vertex.y, vertex.z, _ = *pos,
-                vertex.nx, vertex.ny, vertex.nz, _ = *pos2,
-                vertex.x *= -1
+            return
 
-            ImportStormworksMesh.add_mesh(mesh.mesh_id, vertices, faces, submeshes)
+        if decoding == "PIPELINE":
+            pipeline = MeshPipeline(meshes, partial(ImportStormworksTile._load_mesh, meshfolder))
+
+            for mesh, mesh_data in pipeline:
+                ImportStormworksMesh.add_mesh(mesh.mesh_id, mesh_data, single_object)
+
+            print(pipeline.stats())
+            return
+
+        for mesh in meshes:
+            mesh_data = ImportStormworksTile._load_mesh(meshfolder, mesh)
+
+            ImportStormworksMesh.add_mesh(mesh.mesh_id, mesh_data, single_object)
 
     @staticmethod
-    def import_tile(context, filepath: str) -> None:
+    def import_tile(context, filepath: str, decoding: str, single_object: bool, instancing: bool) -> None:
+        from .core.meshcache import mesh_cache
+
+        ImportStormworksMesh.configure_cache(context)
+
+        preferences = context.preferences.addons[__package__].preferences
+
         print(f"Importing {filepath}")
-        ImportStormworksTile.read_tile(filepath, context.preferences.addons[__package__].preferences.meshfolderpath)
+        ImportStormworksTile.read_tile(filepath, preferences.meshfolderpath, decoding, single_object, instancing)
         print(f"Finished Importing")
+        print(mesh_cache.stats())
 
     def execute(self, context) -> Set[str]:
-        ImportStormworksTile.import_tile(context, self.filepath)
+        from .core.meshcatalog import MeshFolderError
+
+        try:
+            ImportStormworksTile.import_tile(context, self.filepath, self.decoding, self.single_object,
+                                             self.instancing)
+        except MeshFolderError as exception:
+            self.report({"ERROR"}, str(exception))
+            return {"CANCELLED"}
+
         return {"FINISHED"}